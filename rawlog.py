@@ -1,65 +1,48 @@
 #!/usr/bin/env python3
 import argparse
+import heapq
 import json
 import os
 import sys
 import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+from windowlog import (
+    complete_lines_end,
+    find_replay_start,
+    is_regular_file,
+    json_loads,
+    load_log,
+    parse_time_arg,
+)
 
-def parse_time_arg(s: str) -> float:
-    """
-    Parse a time argument as either:
-      - Unix timestamp (integer or float string), or
-      - ISO-8601 like '2025-12-08T10:23:00' (treated as local time).
-    Returns Unix timestamp (float seconds).
-    """
-    # Try numeric (Unix timestamp)
-    try:
-        return float(s)
-    except ValueError:
-        pass
 
-    # Try ISO-like datetime
+def positive_int(s: str) -> int:
+    """argparse type for counts that must be at least 1."""
     try:
-        dt = datetime.fromisoformat(s)
-        return dt.timestamp()
-    except Exception as e:
-        raise argparse.ArgumentTypeError(
-            f"Cannot parse time '{s}' as unix timestamp or ISO datetime: {e}"
-        )
+        n = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{s}'")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {n}")
+    return n
 
 
 def seconds_to_hms(sec: float) -> str:
-    sec = int(round(sec))
-    h = sec // 3600
-    m = (sec % 3600) // 60
-    s = sec % 60
+    # round() already returns an int for floats
+    m, s = divmod(round(sec), 60)
+    h, m = divmod(m, 60)
     return f"{h:02d}:{m:02d}:{s:02d}"
 
 
-def load_log(path: str):
-    """Yield parsed JSON objects from the log file."""
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError:
-                # Skip malformed lines
-                continue
-            yield rec
-
-
 def load_cutoffs(path: Optional[str]) -> Dict[str, float]:
     if not path:
         return {}
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = json_loads(f.read())
 
     cutoffs: Dict[str, float] = {}
     for k, v in (data or {}).items():
@@ -71,78 +54,254 @@ def load_cutoffs(path: Optional[str]) -> Dict[str, float]:
 
 
 def _attribute_focus(
-    focused_hashes: Iterable[str],
+    focused_ids: Iterable[int],
     interval: float,
+    focus_seconds: List[float],
     ensure_entry,
 ):
-    for h in focused_hashes:
-        entry = ensure_entry(h)
-        entry["focus_seconds"] += interval
+    for i in focused_ids:
+        ensure_entry(i)
+        focus_seconds[i] += interval
         # focus attribution never records idle time
 
 
+@dataclass
+class AnalysisState:
+    """Everything analyze() carries from one log record to the next.
+
+    Window hashes are interned to small ints the first time they are seen.
+    Everything per window is then a list indexed by that id, so the hash
+    string is only looked up once per window object, never in the state
+    sets or the stats updates.
+    """
+
+    hash_ids: Dict[str, int] = field(default_factory=dict)
+    id_to_hash: List[str] = field(default_factory=list)
+    titles: List[Optional[str]] = field(default_factory=list)
+    cmds: List[Optional[str]] = field(default_factory=list)
+    activations: List[int] = field(default_factory=list)
+    focus_seconds: List[float] = field(default_factory=list)
+    idle_seconds: List[float] = field(default_factory=list)
+
+    # Ids that have a stats entry, in the order the entries were created
+    reported: List[bool] = field(default_factory=list)
+    report_order: List[int] = field(default_factory=list)
+
+    prev_ts: Optional[float] = None
+    prev_focused: Set[int] = field(default_factory=set)
+    extension_running: bool = False
+    idle: bool = False
+    locked: bool = False
+
+    total_idle: float = 0.0
+    total_locked: float = 0.0
+    total_stopped: float = 0.0
+
+    idle_start_ts: Optional[float] = None
+    idle_cmd: Optional[str] = None
+    idle_focused_ids: Set[int] = field(default_factory=set)
+    idle_overlap: float = 0.0
+    idle_duration: float = 0.0
+
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/rawlog.state")
+
+# Bump when AnalysisState or the analysis rules change so old caches are
+# ignored instead of resumed.
+CACHE_VERSION = 2
+
+# Bytes preceding the saved offset that must still match for a cache to be
+# reused; catches logs that were rewritten in place rather than appended to.
+CACHE_TAIL_BYTES = 256
+
+# AnalysisState fields that are sets; the cache stores them as JSON lists.
+_SET_FIELDS = ("prev_focused", "idle_focused_ids")
+
+
+def _cache_key(log_path, t_start, t_end, cutoffs):
+    # Floats are stored as repr() strings: the window bounds default to
+    # +-inf, which JSON cannot represent, and repr round-trips exactly.
+    return [
+        CACHE_VERSION,
+        os.path.realpath(log_path),
+        repr(t_start),
+        repr(t_end),
+        [[k, repr(v)] for k, v in sorted(cutoffs.items())],
+    ]
+
+
+def load_checkpoint(
+    cache_path: str, log_path: str, key
+) -> Optional[Tuple[AnalysisState, int]]:
+    """Return the saved (state, byte offset) if it can resume ``log_path``."""
+    try:
+        with open(cache_path, "rb") as f:
+            saved = json_loads(f.read())
+        if saved["key"] != key:
+            return None
+
+        offset = saved["offset"]
+        tail = bytes.fromhex(saved["tail"])
+        with open(log_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if [st.st_dev, st.st_ino] != saved["file_id"] or st.st_size < offset:
+                return None
+            f.seek(offset - len(tail))
+            if f.read(len(tail)) != tail:
+                return None
+
+        state = saved["state"]
+        for name in _SET_FIELDS:
+            state[name] = set(state[name])
+        return AnalysisState(**state), offset
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing, stale or unreadable cache: analyze from the start
+        return None
+
+
+def save_checkpoint(
+    cache_path: str, log_path: str, key, state: AnalysisState, offset: int
+):
+    try:
+        with open(log_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            tail_start = max(0, offset - CACHE_TAIL_BYTES)
+            f.seek(tail_start)
+            tail = f.read(offset - tail_start)
+
+        state_dict = dict(vars(state))
+        for name in _SET_FIELDS:
+            state_dict[name] = sorted(state_dict[name])
+        saved = {
+            "key": key,
+            "file_id": [st.st_dev, st.st_ino],
+            "offset": offset,
+            "tail": tail.hex(),
+            "state": state_dict,
+        }
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write cache {cache_path}: {e}", file=sys.stderr)
+
+
 def analyze(
     log_path: str,
     t_start: float,
     t_end: float,
     cutoffs: Optional[Dict[str, float]] = None,
+    cache_path: Optional[str] = None,
 ):
     """
     Analyze the log file between [t_start, t_end] (inclusive).
 
+    If ``cache_path`` is given, the state reached at the end of the log is
+    saved there. A later call with the same log, time window and cutoffs
+    resumes from it and only parses the lines appended since.
+
     Returns:
         stats: dict[hash] = {
             'title': str or None,
             'cmd': str or None,
             'activations': int,
             'focus_seconds': float,
+            'idle_seconds': float,
         }
         hash_to_title: dict[hash] = title
         hash_to_cmd: dict[hash] = cmd
+            (both cover the windows seen from the replay start chosen by
+            find_replay_start() up to the point where reading stopped;
+            reading stops after t_end once nothing later can change stats)
         totals: dict with 'idle', 'locked', 'stopped' (seconds)
     """
-    hash_to_title = {}
-    hash_to_cmd = {}
-
-    # Stats per window hash
-    stats = {}
-
-    def ensure_entry(h):
-        if h not in stats:
-            stats[h] = {
-                "title": hash_to_title.get(h),
-                "cmd": hash_to_cmd.get(h),
-                "activations": 0,
-                "focus_seconds": 0.0,
-                "idle_seconds": 0.0,
-            }
-        return stats[h]
-
-    # Global state over time
-    prev_ts = None
-    prev_windows = {}          # hash -> focused(bool) for previous interval
-    extension_running = False  # whether the logger is active
-    idle = False
-    locked = False
-
-    total_idle = 0.0
-    total_locked = 0.0
-    total_stopped = 0.0
-
     cutoffs = cutoffs or {}
 
-    idle_start_ts: Optional[float] = None
-    idle_cmd: Optional[str] = None
-    idle_focused_hashes: Iterable[str] = []
-    idle_overlap = 0.0
-    idle_duration = 0.0
+    start = 0
+    stop = None
+    state = None
+    if cache_path and not is_regular_file(log_path):
+        # A pipe can only be read once and has no offsets to resume from
+        print(f"Not caching: {log_path} is not a regular file", file=sys.stderr)
+        cache_path = None
+    if cache_path:
+        key = _cache_key(log_path, t_start, t_end, cutoffs)
+        # Only consume whole lines so a line still being written is read
+        # in full by the next run.
+        stop = complete_lines_end(log_path)
+        resumed = load_checkpoint(cache_path, log_path, key)
+        if resumed is not None:
+            state, start = resumed
+    if state is None:
+        state = AnalysisState()
+        if t_start > float("-inf"):
+            start = find_replay_start(log_path, t_start)
+
+    # The hot loop works on locals; containers are shared with ``state``
+    # and the scalars are written back to it after the loop.
+    hash_ids = state.hash_ids
+    id_to_hash = state.id_to_hash
+    titles = state.titles
+    cmds = state.cmds
+    activations = state.activations
+    focus_seconds = state.focus_seconds
+    idle_seconds = state.idle_seconds
+    reported = state.reported
+    report_order = state.report_order
+
+    def intern(h):
+        i = len(id_to_hash)
+        hash_ids[h] = i
+        id_to_hash.append(h)
+        titles.append(None)
+        cmds.append(None)
+        activations.append(0)
+        focus_seconds.append(0.0)
+        idle_seconds.append(0.0)
+        reported.append(False)
+        return i
+
+    def ensure_entry(i):
+        if not reported[i]:
+            reported[i] = True
+            report_order.append(i)
+
+    # Global state over time
+    prev_ts = state.prev_ts
+    prev_focused = state.prev_focused  # ids focused in the previous interval
+    extension_running = state.extension_running  # whether the logger is active
+    idle = state.idle
+    locked = state.locked
+
+    total_idle = state.total_idle
+    total_locked = state.total_locked
+    total_stopped = state.total_stopped
+
+    idle_start_ts = state.idle_start_ts
+    idle_cmd = state.idle_cmd
+    idle_focused_ids = state.idle_focused_ids
+    idle_overlap = state.idle_overlap
+    idle_duration = state.idle_duration
+
+    # hash_ids never changes identity, so bind its lookup once. Binding
+    # rec.get / w.get per record would be slower on CPython 3.11+: it
+    # allocates a bound method, whereas direct x.get(...) calls are
+    # specialized and allocation-free.
+    lookup_id = hash_ids.get
+
+    # Reported ids still missing a title or cmd once reading is past t_end
+    # (see the early exit at the bottom of the loop); None until then
+    pending_names = None
 
     # Iterate records in chronological order (log is append-only)
-    for rec in load_log(log_path):
-        ts = rec.get("ts")
-        if ts is None:
+    for rec in load_log(log_path, start, stop):
+        try:
+            ts = float(rec["ts"])
+        except (KeyError, TypeError, ValueError):
+            # No usable timestamp
             continue
-        ts = float(ts)
 
         # 1) Attribute the interval from prev_ts to ts to the previous state
         if prev_ts is not None:
@@ -167,7 +326,7 @@ def analyze(
                 if idle_start_ts is None:
                     idle_start_ts = seg_start
                     idle_cmd = None
-                    idle_focused_hashes = [h for h, f in prev_windows.items() if f]
+                    idle_focused_ids = prev_focused
                     idle_overlap = 0.0
                     idle_duration = 0.0
                 idle_duration += seg_end - seg_start
@@ -176,14 +335,12 @@ def analyze(
             else:
                 if interval > 0:
                     _attribute_focus(
-                        [h for h, focused in prev_windows.items() if focused],
-                        interval,
-                        ensure_entry,
+                        prev_focused, interval, focus_seconds, ensure_entry
                     )
 
         # Capture previous state for transition detection
         prev_idle_state = idle
-        prev_windows_snapshot = prev_windows
+        prev_focused_snapshot = prev_focused
 
         # 2) Update state based on THIS record
 
@@ -192,81 +349,85 @@ def analyze(
             extension_running = True
             idle = False
             locked = False
-            prev_windows = {}
+            prev_focused = set()
 
         elif "stopped" in rec:
             # Extension is stopping. No windows active until next restart.
             extension_running = False
-            prev_windows = {}
+            prev_focused = set()
 
         elif "windows" in rec:
             # A normal snapshot: windows/idle/locked state
             extension_running = True
-            # idle/locked are booleans indicating current state
-            idle = bool(rec.get("idle", False))
-            locked = bool(rec.get("locked", False))
-
-            full_snapshot = bool(rec.get("full", True))
-            focus_only = bool(rec.get("focusOnly", False))
-
-            state = {} if full_snapshot else dict(prev_windows)
-
-            if focus_only:
-                # Focus change only: clear previous focus flags, keep membership
-                for h in state.keys():
-                    state[h] = False
+            # idle/locked are booleans indicating current state. The parser
+            # already yields True/False, and every consumer only tests
+            # truthiness, so no bool() coercion is needed.
+            idle = rec.get("idle", False)
+            locked = rec.get("locked", False)
+
+            full_snapshot = rec.get("full", True)
+            focus_only = rec.get("focusOnly", False)
+
+            # Only the focused column of the window state is ever consumed, so
+            # track that set per snapshot instead of a hash -> focused dict that
+            # every interval would have to walk. A focus-only record clears all
+            # previous focus flags; membership does not affect attribution.
+            if full_snapshot or focus_only:
+                curr_focused = set()
+            else:
+                curr_focused = set(prev_focused)
 
             windows = rec.get("windows") or []
             for w in windows:
                 h = w.get("hash")
                 if not h:
                     continue
-                focused = bool(w.get("focused", False))
-                state[h] = focused
-
-                # Learn title if present
-                title = w.get("title")
-                if title and h not in hash_to_title:
-                    hash_to_title[h] = title
-                    # Also update existing stats entry if created earlier
-                    if h in stats:
-                        stats[h]["title"] = title
-
-                # Learn cmd if present
-                cmd = w.get("cmd")
-                if cmd and h not in hash_to_cmd:
-                    hash_to_cmd[h] = cmd
-                    if h in stats:
-                        stats[h]["cmd"] = cmd
+                i = lookup_id(h)
+                if i is None:
+                    i = intern(h)
+                if w.get("focused", False):
+                    curr_focused.add(i)
+                else:
+                    curr_focused.discard(i)
+
+                # Learn title/cmd if present. Check the id's slot first: for
+                # windows already known (nearly all of them) this skips the
+                # field lookups entirely.
+                if titles[i] is None:
+                    title = w.get("title")
+                    if title:
+                        titles[i] = title
+
+                if cmds[i] is None:
+                    cmd = w.get("cmd")
+                    if cmd:
+                        cmds[i] = cmd
 
             # Count activations at this instant (if inside time window)
             if t_start <= ts <= t_end:
-                prev_focused = {h for h, f in prev_windows.items() if f}
-                curr_focused = {h for h, f in state.items() if f}
-                for h in curr_focused - prev_focused:
-                    entry = ensure_entry(h)
-                    entry["activations"] += 1
+                # Snapshots hold a handful of focused hashes at most, so a
+                # membership scan beats allocating the set difference.
+                for i in curr_focused:
+                    if i not in prev_focused:
+                        ensure_entry(i)
+                        activations[i] += 1
 
-            prev_windows = state
+            prev_focused = curr_focused
 
         # Detect idle transitions after state update
         # Transitions
         if not prev_idle_state and idle and extension_running and not locked:
             idle_start_ts = ts
-            focused_cmds = [
-                hash_to_cmd.get(h)
-                for h, focused in prev_windows_snapshot.items()
-                if focused and hash_to_cmd.get(h)
-            ]
-            idle_cmd = focused_cmds[0] if focused_cmds else None
-            idle_focused_hashes = [
-                h for h, focused in prev_windows_snapshot.items() if focused
-            ]
+            idle_cmd = next((cmds[i] for i in prev_focused_snapshot if cmds[i]), None)
+            idle_focused_ids = prev_focused_snapshot
             idle_overlap = 0.0
             idle_duration = 0.0
 
         if prev_idle_state and (not idle or not extension_running or locked):
-            if idle_start_ts is not None:
+            # An idle period that never overlapped the window contributes
+            # nothing, and must not create empty stats entries either: the
+            # report would otherwise depend on how much history was replayed.
+            if idle_start_ts is not None and idle_overlap > 0:
                 cutoff = cutoffs.get(idle_cmd, 0.0)
                 treat_as_active = (
                     idle_cmd is not None
@@ -277,18 +438,18 @@ def analyze(
                 )
 
                 if treat_as_active:
-                    _attribute_focus(idle_focused_hashes, idle_overlap, ensure_entry)
+                    _attribute_focus(
+                        idle_focused_ids, idle_overlap, focus_seconds, ensure_entry
+                    )
                 else:
                     total_idle += idle_overlap
-                    post_idle_focused = [h for h, focused in prev_windows.items() if focused]
-                    shared_focus = set(idle_focused_hashes) & set(post_idle_focused)
-                    for h in shared_focus:
-                        entry = ensure_entry(h)
-                        entry["idle_seconds"] += idle_overlap
+                    for i in idle_focused_ids & prev_focused:
+                        ensure_entry(i)
+                        idle_seconds[i] += idle_overlap
 
             idle_start_ts = None
             idle_cmd = None
-            idle_focused_hashes = []
+            idle_focused_ids = set()
             idle_overlap = 0.0
             idle_duration = 0.0
 
@@ -296,6 +457,62 @@ def analyze(
         # 3) Move forward in time
         prev_ts = ts
 
+        # Records after t_end only cover time outside the window (records
+        # *at* t_end still count activations). Once no idle period
+        # overlapping the window is waiting for its end (its full length and
+        # how it ends decide how it counts) the numbers cannot change, and
+        # no new window can be reported. Later records can still supply a
+        # title or cmd for a reported window (cmd is null while the
+        # extension cannot read it), so keep reading until none is missing
+        # -- but only up to the session's end: window hashes are per
+        # session, so nothing after a restart/stop names an earlier window.
+        # A cached state saved here stays valid: anything appended later is
+        # past t_end as well.
+        if ts > t_end and not idle_overlap:
+            if "restart" in rec or "stopped" in rec:
+                break
+            if pending_names is None:
+                pending_names = [
+                    i for i in report_order if titles[i] is None or cmds[i] is None
+                ]
+            elif pending_names:
+                pending_names = [
+                    i for i in pending_names
+                    if titles[i] is None or cmds[i] is None
+                ]
+            if not pending_names:
+                break
+
+    state.prev_ts = prev_ts
+    state.prev_focused = prev_focused
+    state.extension_running = extension_running
+    state.idle = idle
+    state.locked = locked
+    state.total_idle = total_idle
+    state.total_locked = total_locked
+    state.total_stopped = total_stopped
+    state.idle_start_ts = idle_start_ts
+    state.idle_cmd = idle_cmd
+    state.idle_focused_ids = idle_focused_ids
+    state.idle_overlap = idle_overlap
+    state.idle_duration = idle_duration
+
+    if cache_path:
+        save_checkpoint(cache_path, log_path, key, state, stop)
+
+    stats = {
+        id_to_hash[i]: {
+            "title": titles[i],
+            "cmd": cmds[i],
+            "activations": activations[i],
+            "focus_seconds": focus_seconds[i],
+            "idle_seconds": idle_seconds[i],
+        }
+        for i in report_order
+    }
+    hash_to_title = {id_to_hash[i]: t for i, t in enumerate(titles) if t}
+    hash_to_cmd = {id_to_hash[i]: c for i, c in enumerate(cmds) if c}
+
     totals = {
         "idle": total_idle,
         "locked": total_locked,
@@ -305,6 +522,17 @@ def analyze(
     return stats, hash_to_title, hash_to_cmd, totals
 
 
+def top_rows(rows, key, limit: Optional[int] = None):
+    """Return ``rows`` sorted by ``key`` descending, keeping at most ``limit``.
+
+    With a limit only a heap of that size is maintained (O(n log k)) instead
+    of sorting every row; ties keep their original order either way.
+    """
+    if limit is None:
+        return sorted(rows, key=key, reverse=True)
+    return heapq.nlargest(limit, rows, key=key)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
@@ -351,6 +579,27 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        "--top",
+        type=positive_int,
+        metavar="N",
+        help="Only show the N rows with the most focus time (default: all).",
+    )
+
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+        help=(
+            "Save the analysis state to PATH (default: "
+            f"{DEFAULT_CACHE_PATH}) and resume from it on the next run, so "
+            "only newly appended log lines are parsed. The cache is reused "
+            "only when the time window and cutoffs are unchanged, which makes "
+            "it most useful with the full log or a fixed --range."
+        ),
+    )
+
     args = parser.parse_args()
 
     now = time.time()
@@ -373,7 +622,7 @@ def main():
     cutoffs = load_cutoffs(args.cutoffs)
 
     stats, hash_to_title, hash_to_cmd, totals = analyze(
-        args.log, t_start, t_end, cutoffs=cutoffs
+        args.log, t_start, t_end, cutoffs=cutoffs, cache_path=args.cache
     )
 
     total_time = totals["idle"] + totals["locked"] + totals["stopped"]
@@ -387,17 +636,17 @@ def main():
 
     if args.window:
         # --- Per-window report (title/hash) ---
-        sorted_items = sorted(
-            stats.items(),
-            key=lambda kv: kv[1]["focus_seconds"],
-            reverse=True,
+        sorted_items = top_rows(
+            stats.items(), lambda kv: kv[1]["focus_seconds"], args.top
         )
 
-        print(
+        # Rows are collected and written in one call rather than printed
+        # one at a time; --window reports can run to thousands of rows.
+        lines = [
             f"{'Hash':<20}  {'Title':<40}  {'Cmd':<40}  "
-            f"{'Activations':>11}  {'Focus Time':>10}  {'Idle Time':>9}"
-        )
-        print("-" * 132)
+            f"{'Activations':>11}  {'Focus Time':>10}  {'Idle Time':>9}",
+            "-" * 132,
+        ]
 
         for h, entry in sorted_items:
             title = entry["title"] or "<unknown>"
@@ -409,17 +658,10 @@ def main():
             idle_hms = seconds_to_hms(idle_sec)
 
             # Truncate fields for display
-            if len(title) > 40:
-                title_disp = title[:37] + "..."
-            else:
-                title_disp = title
+            title_disp = title if len(title) <= 40 else title[:37] + "..."
+            cmd_disp = cmd if len(cmd) <= 40 else cmd[:37] + "..."
 
-            if len(cmd) > 40:
-                cmd_disp = cmd[:37] + "..."
-            else:
-                cmd_disp = cmd
-
-            print(
+            lines.append(
                 f"{h:<20}  {title_disp:<40}  {cmd_disp:<40}  "
                 f"{activations:>11d}  {focus_hms:>10}  {idle_hms:>9}"
             )
@@ -443,17 +685,15 @@ def main():
             rec["focus_seconds"] += entry["focus_seconds"]
             rec["idle_seconds"] += entry["idle_seconds"]
 
-        sorted_cmds = sorted(
-            agg.values(),
-            key=lambda e: e["focus_seconds"],
-            reverse=True,
+        sorted_cmds = top_rows(
+            agg.values(), lambda e: e["focus_seconds"], args.top
         )
 
-        print(
+        lines = [
             f"{'Cmd':<60}  {'Activations':>11}  "
-            f"{'Focus Time':>10}  {'Idle Time':>9}"
-        )
-        print("-" * 103)
+            f"{'Focus Time':>10}  {'Idle Time':>9}",
+            "-" * 103,
+        ]
 
         for rec in sorted_cmds:
             cmd = rec["cmd"]
@@ -463,21 +703,21 @@ def main():
             focus_hms = seconds_to_hms(focus_sec)
             idle_hms = seconds_to_hms(idle_sec)
 
-            if len(cmd) > 60:
-                cmd_disp = cmd[:57] + "..."
-            else:
-                cmd_disp = cmd
+            cmd_disp = cmd if len(cmd) <= 60 else cmd[:57] + "..."
 
-            print(
+            lines.append(
                 f"{cmd_disp:<60}  {activations:>11d}  "
                 f"{focus_hms:>10}  {idle_hms:>9}"
             )
 
-    print()
-    print("Totals (excluding any overlapping outside the time window):")
-    print(f"  Idle time   : {seconds_to_hms(totals['idle'])}")
-    print(f"  Locked time : {seconds_to_hms(totals['locked'])}")
-    print(f"  Stopped time: {seconds_to_hms(totals['stopped'])}")
+    lines += [
+        "",
+        "Totals (excluding any overlapping outside the time window):",
+        f"  Idle time   : {seconds_to_hms(totals['idle'])}",
+        f"  Locked time : {seconds_to_hms(totals['locked'])}",
+        f"  Stopped time: {seconds_to_hms(totals['stopped'])}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
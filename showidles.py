@@ -9,19 +9,18 @@ focus after idling are included; use --include-switches to keep idle periods
 that end on a different command.
 """
 import argparse
-import json
 import os
 import sys
 import time
-from datetime import datetime
-import statistics
-from typing import Dict, List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 
-import matplotlib
+from windowlog import find_replay_start, json_loads, load_log, parse_time_arg
 
 
-DEFAULT_LOG_PATH = os.path.expanduser("~/.local/share/window-logger.log")
-DEFAULT_CUTOFF_PATH = os.path.expanduser("~/.local/share/appmap.json")
+# Left unexpanded until main() uses them; --help shows them as written
+DEFAULT_LOG_PATH = "~/.local/share/window-logger.log"
+DEFAULT_CUTOFF_PATH = "~/.local/share/appmap.json"
 
 
 def load_cutoffs(path: str) -> Dict[str, float]:
@@ -31,8 +30,8 @@ def load_cutoffs(path: str) -> Dict[str, float]:
     surface it to the user.
     """
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = json_loads(f.read())
 
     cutoffs: Dict[str, float] = {}
     for cmd, seconds in data.items():
@@ -44,36 +43,6 @@ def load_cutoffs(path: str) -> Dict[str, float]:
     return cutoffs
 
 
-def parse_time_arg(s: str) -> float:
-    """Parse a time argument as unix timestamp or ISO-8601 string."""
-    try:
-        return float(s)
-    except ValueError:
-        pass
-
-    try:
-        dt = datetime.fromisoformat(s)
-        return dt.timestamp()
-    except Exception as e:  # noqa: BLE001
-        raise argparse.ArgumentTypeError(
-            f"Cannot parse time '{s}' as unix timestamp or ISO datetime: {e}"
-        )
-
-
-def load_log(path: str):
-    """Yield parsed JSON objects from the log file."""
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            yield rec
-
-
 def extract_idle_durations(
     log_path: str,
     t_start: float,
@@ -95,8 +64,14 @@ def extract_idle_durations(
     brief pause counts as active time.
     """
 
+    # Focus is tracked as the set of focused window hashes. hash_to_cmd
+    # keeps the first cmd seen for a hash; window_cmd holds the cmd from the
+    # hash's latest snapshot entry (falling back to hash_to_cmd when that
+    # entry had none). Hashes are derived from titles, so windows of
+    # different processes can share one and the latest cmd is what counts.
     hash_to_cmd: Dict[str, str] = {}
-    prev_windows: Dict[str, Dict[str, object]] = {}
+    window_cmd: Dict[str, Optional[str]] = {}
+    focused: Set[str] = set()
 
     extension_running = False
     idle = False
@@ -105,58 +80,79 @@ def extract_idle_durations(
     idle_start_ts: Optional[float] = None
     idle_cmd: Optional[str] = None
 
-    durations_by_cmd: Dict[str, List[float]] = {}
+    # defaultdict avoids allocating a throwaway [] on every append the way
+    # setdefault(cmd, []) does
+    durations_by_cmd: Dict[str, List[float]] = defaultdict(list)
+
+    # A restart record resets all of the state below (an idle period open
+    # across it ends at the restart), so replay can begin at the last
+    # restart before t_start rather than at the top of the log.
+    start = 0
+    if t_start > float("-inf"):
+        start = find_replay_start(log_path, t_start)
 
-    for rec in load_log(log_path):
+    for rec in load_log(log_path, start):
         ts = rec.get("ts")
         if ts is None:
             continue
         ts = float(ts)
 
-        new_extension_running = extension_running
-        new_idle = idle
-        new_locked = locked
-        windows_new: Dict[str, Dict[str, object]] = prev_windows
+        # The state is updated in place below; idle-start detection needs
+        # what it was before this record. The windows branch builds a new
+        # focused set, so the old one can be kept by reference.
+        was_idle = idle
+        prev_focused = focused
+        # (hash, cmd) of the windows focused before this record; only
+        # filled in when this record may start an idle period.
+        prev_focused_cmds: List[Tuple[str, Optional[str]]] = []
 
         if "restart" in rec:
-            new_extension_running = True
-            new_idle = False
-            new_locked = False
-            windows_new = {}
+            extension_running = True
+            idle = False
+            locked = False
+            focused = set()
         elif "stopped" in rec:
-            new_extension_running = False
-            windows_new = {}
+            extension_running = False
+            focused = set()
         elif "windows" in rec:
-            new_extension_running = True
-            new_idle = bool(rec.get("idle", False))
-            new_locked = bool(rec.get("locked", False))
-
-            full_snapshot = bool(rec.get("full", True))
-            focus_only = bool(rec.get("focusOnly", False))
-
-            windows_new = {} if full_snapshot else dict(prev_windows)
-
-            if focus_only:
-                for h, info in windows_new.items():
-                    windows_new[h] = {**info, "focused": False}
+            extension_running = True
+            # The flags are only ever tested for truthiness, so the decoded
+            # JSON booleans are used as they are.
+            idle = rec.get("idle", False)
+            locked = rec.get("locked", False)
+
+            # An idle period starting at this record is attributed to the
+            # cmds of the windows focused before it; note them before the
+            # loop below overwrites their window_cmd entries.
+            if idle and not was_idle and not locked:
+                prev_focused_cmds = [(h, window_cmd[h]) for h in prev_focused]
+
+            full_snapshot = rec.get("full", True)
+            focus_only = rec.get("focusOnly", False)
+
+            # Full snapshots list every window and focus-only ones clear all
+            # focus first; otherwise unlisted windows keep their focus.
+            if full_snapshot or focus_only:
+                focused = set()
+            else:
+                focused = set(prev_focused)
 
             for w in rec.get("windows") or []:
                 h = w.get("hash")
                 if not h:
                     continue
-                focused = bool(w.get("focused", False))
                 cmd = w.get("cmd")
                 if cmd:
                     hash_to_cmd.setdefault(h, cmd)
-                known_cmd = cmd or hash_to_cmd.get(h)
-                windows_new[h] = {
-                    "focused": focused,
-                    "cmd": known_cmd,
-                }
+                window_cmd[h] = cmd or hash_to_cmd.get(h)
+                if w.get("focused", False):
+                    focused.add(h)
+                else:
+                    focused.discard(h)
 
         # If we are currently in an idle period, check if it ends at this record.
         if idle_start_ts is not None:
-            idle_ends = (not new_extension_running) or new_locked or (not new_idle)
+            idle_ends = (not extension_running) or locked or (not idle)
             if idle_ends:
                 idle_end_ts = ts
 
@@ -167,13 +163,11 @@ def extract_idle_durations(
 
                     if duration > 0:
                         end_cmd: Optional[str] = None
-                        if new_extension_running and not new_idle and not new_locked:
-                            focused_cmds = [
-                                info.get("cmd")
-                                for info in windows_new.values()
-                                if info.get("focused") and info.get("cmd")
-                            ]
-                            end_cmd = focused_cmds[0] if focused_cmds else None
+                        if extension_running and not idle and not locked:
+                            end_cmd = next(
+                                (window_cmd[h] for h in focused if window_cmd[h]),
+                                None,
+                            )
 
                         include = idle_cmd is not None
                         if include:
@@ -183,9 +177,7 @@ def extract_idle_durations(
                         if include:
                             cutoff = (cutoffs or {}).get(idle_cmd, 0)
                             if duration >= cutoff:
-                                durations_by_cmd.setdefault(idle_cmd, []).append(
-                                    duration
-                                )
+                                durations_by_cmd[idle_cmd].append(duration)
 
                 idle_start_ts = None
                 idle_cmd = None
@@ -193,28 +185,29 @@ def extract_idle_durations(
         # Detect the start of a new idle period.
         starts_idle = (
             idle_start_ts is None
-            and not idle
-            and new_idle
-            and new_extension_running
-            and not new_locked
+            and not was_idle
+            and idle
+            and extension_running
+            and not locked
         )
         if starts_idle:
-            focused_cmds = [
-                info.get("cmd") or hash_to_cmd.get(h)
-                for h, info in prev_windows.items()
-                if info.get("focused")
-            ]
-            start_cmd = focused_cmds[0] if focused_cmds else None
+            # Only the first focused window matters; stop at it. A cmd
+            # missing from prev_focused_cmds may have been learned from this
+            # very record.
+            start_cmd = next(
+                (c or hash_to_cmd.get(h) for h, c in prev_focused_cmds), None
+            )
             if start_cmd:
                 idle_start_ts = ts
                 idle_cmd = start_cmd
 
-        extension_running = new_extension_running
-        idle = new_idle
-        locked = new_locked
-        prev_windows = windows_new
+        # Past t_end only an idle period that started inside the window can
+        # still be counted, and it needs the record that ends it. Anything
+        # else after this point falls outside the window.
+        if ts >= t_end and (idle_start_ts is None or idle_start_ts >= t_end):
+            break
 
-    return durations_by_cmd
+    return dict(durations_by_cmd)
 
 
 def plot_boxplot(durations_by_cmd: Dict[str, List[float]], output: Optional[str] = None):
@@ -222,6 +215,11 @@ def plot_boxplot(durations_by_cmd: Dict[str, List[float]], output: Optional[str]
         print("No idle durations found for the specified time window.")
         return
 
+    # matplotlib is only imported once there is something to plot, so the
+    # table-only paths (and --help) don't pay for it. The backend has to be
+    # chosen before pyplot is first imported.
+    import matplotlib
+
     if output:
         matplotlib.use("Agg")
     elif not os.environ.get("DISPLAY"):
@@ -270,20 +268,16 @@ def print_summary_table(durations_by_cmd: Dict[str, List[float]]) -> bool:
 
         return f"{value:7.1f}"
 
+    # numpy ships with matplotlib; import it here like pyplot in plot_boxplot
+    import numpy as np
+
     for cmd in sorted(durations_by_cmd.keys()):
-        durations = sorted(durations_by_cmd[cmd])
+        durations = np.asarray(durations_by_cmd[cmd], dtype=np.float64)
         count = len(durations)
-        mean_val = statistics.mean(durations)
-        median_val = statistics.median(durations)
-
-        if count >= 2:
-            q1, _, q3 = statistics.quantiles(
-                durations, n=4, method="inclusive"
-            )
-        else:
-            # With a single sample, treat both quartiles as the lone value to
-            # avoid statistics.StatisticsError while keeping the table useful.
-            q1 = q3 = durations[0]
+        mean_val = durations.mean()
+        # Linear interpolation matches statistics.quantiles(method="inclusive")
+        # and also covers a single sample, where every quartile is that value.
+        q1, median_val, q3 = np.percentile(durations, [25, 50, 75])
         rows.append(
             [
                 cmd,
@@ -309,10 +303,10 @@ def print_summary_table(durations_by_cmd: Dict[str, List[float]]) -> bool:
                 formatted_cells.append(val.rjust(col_widths[idx]))
         return "  ".join(formatted_cells)
 
-    print(format_row(headers))
-    print(format_row(["-" * w for w in col_widths]))
-    for row in rows:
-        print(format_row(row))
+    # Write the whole table in one call instead of a print() per row
+    lines = [format_row(headers), format_row(["-" * w for w in col_widths])]
+    lines.extend(format_row(row) for row in rows)
+    sys.stdout.write("\n".join(lines) + "\n")
 
     return True
 
@@ -381,6 +375,7 @@ def main():
         t_start = float("-inf")
         t_end = float("inf")
 
+    args.log = os.path.expanduser(args.log)
     if not os.path.exists(args.log):
         print(f"Log file not found: {args.log}", file=sys.stderr)
         sys.exit(1)
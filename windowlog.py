@@ -0,0 +1,214 @@
+"""
+Shared reader for the window-logger JSONL log.
+
+rawlog.py and showidles.py both use these helpers to stream records out of
+the log, to seek to the part of it a time window needs, and to parse their
+--range arguments, so the parsing fast paths live in one place. The two
+scripts keep their own state machines.
+"""
+import argparse
+import functools
+import json
+import mmap
+import os
+import re
+import stat
+from datetime import datetime
+from typing import Iterable, Optional
+
+try:
+    # orjson parses straight from bytes and is several times faster than the
+    # stdlib on the large, repetitive JSONL logs the extension writes.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+# ISO dates start with YYYY-MM-DD; parse_time_arg sends those straight to
+# fromisoformat instead of letting float() raise on them first
+_ISO_DATE_RE = re.compile(r"\d{4}-\d\d-\d\d")
+
+
+@functools.lru_cache(maxsize=16)
+def parse_time_arg(s: str) -> float:
+    """
+    Parse a time argument as either:
+      - Unix timestamp (integer or float string), or
+      - ISO-8601 like '2025-12-08T10:23:00' (treated as local time).
+    Returns Unix timestamp (float seconds).
+    """
+    if not _ISO_DATE_RE.match(s):
+        # Try numeric (e.g. 1700000000 or 1.7e9)
+        try:
+            return float(s)
+        except ValueError:
+            pass
+
+    # Try ISO-like datetime
+    try:
+        dt = datetime.fromisoformat(s)
+        return dt.timestamp()
+    except Exception as e:
+        raise argparse.ArgumentTypeError(
+            f"Cannot parse time '{s}' as unix timestamp or ISO datetime: {e}"
+        )
+
+
+# Bytes of log handed to bytes.split() at a time by load_log
+LOG_BLOCK_SIZE = 1 << 16
+
+
+def is_regular_file(path: str) -> bool:
+    """Return True if ``path`` is a regular file (not a pipe, FIFO, etc.).
+
+    Only regular files can be mapped and have byte offsets that stay put,
+    so the seeking helpers below and rawlog's --cache require one.
+    """
+    return stat.S_ISREG(os.stat(path).st_mode)
+
+
+def _parse_lines(lines: Iterable[bytes]):
+    """Yield the JSON objects among raw log ``lines``, skipping bad ones."""
+    for line in lines:
+        # No strip(): both parsers skip surrounding whitespace (including
+        # the \r of CRLF lines) themselves, and a blank line that is not
+        # empty fails to parse below.
+        if not line:
+            continue
+        try:
+            rec = json_loads(line)
+        except ValueError:
+            # Skip malformed lines (orjson and json errors are both
+            # ValueErrors)
+            continue
+        yield rec
+
+
+def load_log(path: str, start: int = 0, stop: Optional[int] = None):
+    """Yield parsed JSON objects from the log file.
+
+    ``start`` and ``stop`` restrict parsing to a byte range of the file. Both
+    must fall on line boundaries; ``stop`` defaults to the end of the file.
+    Pipes and other non-regular files (e.g. ``<(zcat old.log.gz)``) are
+    streamed line by line from the top; they take no byte range.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            if start or stop is not None:
+                raise ValueError(f"{path} is not a regular file; cannot seek")
+            yield from _parse_lines(f)
+            return
+        if st.st_size == 0:
+            return  # mmap refuses empty files
+        # Map the log and split it a block at a time: bytes.split() finds the
+        # newlines in C, and each raw line goes to the parser without a UTF-8
+        # decode (both parsers accept bytes).
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm) if stop is None else min(stop, len(mm))
+            pos = start
+            while pos < size:
+                # Extend each block to the next newline so no line is split
+                end = mm.find(b"\n", pos + LOG_BLOCK_SIZE, size)
+                end = size if end < 0 else end + 1
+                yield from _parse_lines(mm[pos:end].split(b"\n"))
+                pos = end
+
+
+def complete_lines_end(path: str) -> int:
+    """Return the byte offset just past the last newline in the log.
+
+    Raises ValueError for pipes and other non-regular files, which have no
+    fixed end to measure.
+    """
+    if not is_regular_file(path):
+        raise ValueError(f"{path} is not a regular file")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.rfind(b"\n") + 1
+
+
+RESTART_MARKER = b'"restart":true'
+
+
+def line_ts(line: bytes) -> Optional[float]:
+    """Return the ``ts`` of a raw log line without decoding the whole record."""
+    # The extension always writes ts as the first key: {"ts":1700000000,...
+    if line.startswith(b'{"ts":'):
+        end = line.find(b",", 6)
+        if end < 0:
+            end = line.find(b"}", 6)
+        try:
+            return float(line[6:end])
+        except ValueError:
+            pass
+    try:
+        return float(json_loads(line)["ts"])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def bisect_log(mm, t: float) -> int:
+    """Return the offset of the first line in ``mm`` whose ts is after ``t``.
+
+    The log is append-only, so timestamps never decrease and a binary search
+    over byte offsets only reads O(log n) lines. Lines without a readable
+    ts are skipped over. Returns ``len(mm)`` if every line is at or before
+    ``t``.
+    """
+    lo, hi = 0, len(mm)  # both are always line starts (or EOF)
+    while lo < hi:
+        # Probe the line containing the midpoint
+        probe = mm.rfind(b"\n", lo, (lo + hi) // 2) + 1 or lo
+        pos = probe
+        ts = None
+        while ts is None and pos < hi:
+            line_end = mm.find(b"\n", pos, hi)
+            if line_end < 0:
+                line_end = hi
+            ts = line_ts(mm[pos:line_end])
+            pos = line_end + 1
+        if ts is not None and ts <= t:
+            lo = min(pos, hi)
+        else:
+            hi = probe
+    return lo
+
+
+def find_replay_start(path: str, t_start: float) -> int:
+    """Return the byte offset analysis of [t_start, ...] can start from.
+
+    This is the start of the last restart record strictly before
+    ``t_start`` (0 if there is none). A restart resets all analysis state,
+    and after it the extension logs window titles again. No record before
+    that point can change the result for a window that opens at
+    ``t_start``. A restart *at* ``t_start`` is not enough: timestamps are
+    whole seconds, so records earlier in that same second (say, a snapshot
+    just before a stop/restart pair) fall inside the window too.
+
+    The end of the history is found with bisect_log(). The restart markers
+    are then searched backwards from there, so only a few timestamps are
+    read and nothing before the window is JSON-decoded.
+
+    Pipes and other non-regular files cannot be searched, and reading them
+    here would consume them, so for those replay starts at 0 (the top).
+    """
+    if not is_regular_file(path):
+        return 0
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.rfind(RESTART_MARKER, 0, bisect_log(mm, t_start))
+            while pos >= 0:
+                line_start = mm.rfind(b"\n", 0, pos) + 1
+                line_end = mm.find(b"\n", pos)
+                if line_end < 0:
+                    line_end = len(mm)
+                ts = line_ts(mm[line_start:line_end])
+                if ts is not None and ts < t_start:
+                    return line_start
+                pos = mm.rfind(RESTART_MARKER, 0, line_start)
+            return 0